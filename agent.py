@@ -5,6 +5,11 @@ from agents.run_context import RunContextWrapper
 
 from agents import set_tracing_disabled
 
+try:
+    import uvloop  # not available on Windows
+except ImportError:
+    uvloop = None
+
 set_tracing_disabled(True)
 
 async def main():
@@ -40,4 +45,7 @@ async def main():
         result = await Runner.run(agent, "How many files do I have on my Desktop and what are the file names?", max_turns=10)
         print("Agent output:", result.final_output)
 
-asyncio.run(main())
\ No newline at end of file
+if uvloop is not None:
+    uvloop.run(main())
+else:
+    asyncio.run(main())
\ No newline at end of file
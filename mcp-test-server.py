@@ -1,30 +1,49 @@
 from fastmcp import FastMCP
 from pathlib import Path
+import functools
 import platform
 import os
+import time
 
 mcp = FastMCP("desktop_file_lister")
 
+DESKTOP = Path.home() / "Desktop"
+
+# Last listing of DESKTOP, reused while the directory's mtime is unchanged and
+# for at most DESKTOP_CACHE_TTL seconds, since coarse filesystem timestamps
+# (FAT, HFS+, network mounts) can hide two changes made within one tick
+DESKTOP_CACHE_TTL = 2.0
+_desktop_cache = {"mtime": None, "expires": 0.0, "result": None}
+
 
 @mcp.tool(description="Lists all files and folders on the Desktop with their names")
 def list_desktop_files() -> str:
-    desktop = Path.home() / "Desktop"
-    if not desktop.exists():
+    try:
+        st = os.stat(DESKTOP)
+    except FileNotFoundError:
         return "Desktop folder not found."
 
+    now = time.monotonic()
+    if st.st_mtime_ns == _desktop_cache["mtime"] and now < _desktop_cache["expires"]:
+        return _desktop_cache["result"]
+
     # Collect file/folder names
-    items = [f.name for f in desktop.iterdir()]
-    if not items:
-        return "Desktop is empty."
+    with os.scandir(DESKTOP) as it:
+        items = [entry.name for entry in it]
 
-    return "\n".join(items)
+    result = "\n".join(items) if items else "Desktop is empty."
+    _desktop_cache["mtime"] = st.st_mtime_ns
+    _desktop_cache["expires"] = now + DESKTOP_CACHE_TTL
+    _desktop_cache["result"] = result
+    return result
 
 @mcp.tool(description="Get the current working directory")
 def get_current_directory() -> str:
     return str(Path.cwd())
 
-@mcp.tool(description="Get system information including OS and Python version")
-def get_system_info() -> str:
+@functools.lru_cache(maxsize=1)
+def _system_info() -> str:
+    # Constant for the life of the process; platform.processor() can shell out
     info = [
         f"Operating System: {platform.system()} {platform.release()}",
         f"Python Version: {platform.python_version()}",
@@ -34,6 +53,10 @@ def get_system_info() -> str:
     ]
     return "\n".join(info)
 
+@mcp.tool(description="Get system information including OS and Python version")
+def get_system_info() -> str:
+    return _system_info()
+
 @mcp.tool(description="Get a person's favorite food given the name of a person")
 def get_favorite_food(name: str) -> str:
     return f"{name}'s favorite food is pizza"
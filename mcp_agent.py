@@ -1,65 +1,89 @@
 #!/usr/bin/env python3
-from mcp_client import PureMCPClient
-from typing import Dict, Any, Optional, List
-import requests
+from mcp_client import PureMCPClient, get_http_client, close_http_client
+from typing import Dict, Any, Optional, List, Tuple, FrozenSet
+from collections import OrderedDict
+import asyncio
+import difflib
+import hashlib
 import json
+import orjson
+import re
+import string
 
 class LLMAgent:
     """An LLM-powered agent that can make multiple tool calls to accomplish tasks."""
     
-    def __init__(self, clients: List[PureMCPClient], llm_base_url: str = "http://localhost:8080"):
+    LLM_CACHE_SIZE = 512
+    # Verbs shared by many tool names; they say nothing about which tool to pick
+    GENERIC_TOOL_TOKENS = frozenset({"get", "list", "set", "show", "find", "read", "fetch"})
+    # Lookup-style tasks are answered by the first non-empty tool result;
+    # command-style tasks always need the LLM to judge completion
+    LOOKUP_TASK_RE = re.compile(r"\b(how many|list|what are|show|get)\b", re.I)
+    COMMAND_TASK_RE = re.compile(r"\b(send|write|create)\b", re.I)
+    
+    def __init__(self, clients: List[PureMCPClient], llm_base_url: str = "http://localhost:8080",
+                 stream: bool = False):
         self.clients = clients if isinstance(clients, list) else [clients]
         self.llm_base_url = llm_base_url.rstrip('/')
+        self.stream = stream  # completions are only used whole, so streaming is opt-in
         self.available_tools = []
         self.tool_to_client = {} 
+        self._tool_tokens = []
+        self._tools_prompt = ""
+        self._tool_by_lower_name = {}
         self.llm_available = False
+        self._llm_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._plan_cache: Dict[Tuple[str, FrozenSet[str]], List[str]] = {}
         
-    def test_llm_connection(self) -> bool:
+    async def test_llm_connection(self) -> bool:
         """Test if LLM server is available."""
         try:
-            response = requests.get(f"{self.llm_base_url}/v1/models", timeout=5)
+            response = await get_http_client().get(f"{self.llm_base_url}/v1/models", timeout=5)
             self.llm_available = response.status_code == 200
             return self.llm_available
         except:
             self.llm_available = False
             return False
     
-    def initialize(self):
+    @staticmethod
+    async def _connect(client: PureMCPClient):
+        """Initialize a single client and fetch its tools."""
+        init_result = await client.initialize()
+        tools_result = await client.list_tools()
+        return init_result, tools_result
+    
+    async def initialize(self):
         """Initialize the agent and get available tools from all clients."""
-        # Test LLM connection first
-        llm_status = self.test_llm_connection()
+        # Probe the LLM and connect to every server concurrently; each server
+        # lists its tools as soon as its own handshake is done
+        print(f"🔌 Connecting to {len(self.clients)} server(s)...")
+        llm_status, *connections = await asyncio.gather(
+            self.test_llm_connection(),
+            *(self._connect(client) for client in self.clients),
+            return_exceptions=True
+        )
         print(f"🧠 LLM server ({'✅ Available' if llm_status else '❌ Unavailable'}) at {self.llm_base_url}")
         
         all_init_results = []
-        self.available_tools = []
-        self.tool_to_client = {}
+        raw_tools = []
         
-        for i, client in enumerate(self.clients):
+        for i, (client, connection) in enumerate(zip(self.clients, connections)):
             try:
-                print(f"🔌 Connecting to server {i+1}/{len(self.clients)}...")
-                init_result = client.initialize()
+                if isinstance(connection, BaseException):
+                    raise connection
+                init_result, tools_result = connection
                 all_init_results.append(init_result)
                 
                 server_name = init_result['result']['serverInfo']['name']
                 print(f"✅ Connected to: {server_name}")
                 
                 # Get tools from this server
-                tools_result = client.list_tools()
                 server_tools = tools_result['result']['tools']
                 
                 # Add server info to each tool and track which client provides it
                 for tool in server_tools:
-                    tool_name = tool['name']
-                    # Handle name conflicts by prefixing with server name
-                    if tool_name in self.tool_to_client:
-                        original_name = tool_name
-                        tool_name = f"{server_name}_{original_name}"
-                        tool['name'] = tool_name
-                        print(f"⚠️  Tool name conflict: '{original_name}' renamed to '{tool_name}'")
-                    
                     tool['server'] = server_name
-                    self.tool_to_client[tool_name] = client
-                    self.available_tools.append(tool)
+                    raw_tools.append((tool, client))
                 
                 print(f"📊 Found {len(server_tools)} tool(s) from {server_name}")
                 
@@ -67,19 +91,70 @@ class LLMAgent:
                 print(f"❌ Failed to connect to server {i+1}: {e}")
                 continue
         
-        if not self.available_tools:
+        if not raw_tools:
             raise Exception("No tools available from any server")
+        
+        # Register all tools in one pass, building every lookup used per turn
+        self.available_tools = []
+        self.tool_to_client = {}
+        self._tool_by_lower_name = {}
+        self._tool_tokens = []
+        prompt_lines = ["Available tools:\n"]
+        
+        for i, (tool, client) in enumerate(raw_tools, 1):
+            tool_name = tool['name']
+            # Handle name conflicts by prefixing with server name
+            if tool_name in self.tool_to_client:
+                original_name = tool_name
+                tool_name = f"{tool['server']}_{original_name}"
+                tool['name'] = tool_name
+                print(f"⚠️  Tool name conflict: '{original_name}' renamed to '{tool_name}'")
             
+            self.tool_to_client[tool_name] = client
+            self.available_tools.append(tool)
+            self._tool_by_lower_name[tool_name.lower()] = tool
+            # Keyword set used to pick an unambiguous tool without asking the LLM
+            self._tool_tokens.append((tool, self._tokenize(tool_name) - self.GENERIC_TOOL_TOKENS))
+            prompt_lines.append(self._tool_prompt_line(i, tool))
+        
+        # Tool list for selection prompts; the tool set is fixed until the next initialize()
+        self._tools_prompt = "".join(prompt_lines)
+        
         print(f"🎯 Total tools available: {len(self.available_tools)}")
         return all_init_results, self.available_tools
     
-    def _call_llm(self, messages: List[Dict[str, str]]) -> str:
-        """Call the LLM with the given messages."""
+    @staticmethod
+    def _tool_prompt_line(i: int, tool: Dict) -> str:
+        """Format one numbered entry of the "Available tools" prompt listing."""
+        return f"{i}. {tool['name']}: {tool['description']} (from {tool['server']})\n"
+    
+    @staticmethod
+    def _llm_cache_key(messages: List[Dict[str, str]]) -> str:
+        """Hash the prompt messages into a stable cache key."""
+        return hashlib.sha256(json.dumps(messages, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    async def _call_llm(self, messages: List[Dict[str, str]]) -> str:
+        """Call the LLM with the given messages, reusing cached responses for identical prompts."""
         if not self.llm_available:
             return ""
-            
+        
+        key = self._llm_cache_key(messages)
+        if key in self._llm_cache:
+            self._llm_cache.move_to_end(key)
+            return self._llm_cache[key]
+        
+        content = await self._request_llm(messages)
+        if content:
+            self._llm_cache[key] = content
+            if len(self._llm_cache) > self.LLM_CACHE_SIZE:
+                self._llm_cache.popitem(last=False)
+        return content
+    
+    async def _request_llm(self, messages: List[Dict[str, str]]) -> str:
+        """Send the messages to the LLM server and return the completion text."""
         try:
-            response = requests.post(
+            async with get_http_client().stream(
+                "POST",
                 f"{self.llm_base_url}/v1/chat/completions",
                 headers={
                     "Content-Type": "application/json",
@@ -87,29 +162,17 @@ class LLMAgent:
                 },
                 json={
                     "messages": messages,
-                    "stream": True
+                    "stream": self.stream
                 },
                 timeout=30
-            )
-            response.raise_for_status()
-            
-            # Handle streaming response
-            content = ""
-            for line in response.iter_lines():
-                if line:
-                    line = line.decode('utf-8')
-                    if line.startswith('data: '):
-                        data_str = line[6:]  # Remove 'data: ' prefix
-                        if data_str.strip() == '[DONE]':
-                            break
-                        try:
-                            data = json.loads(data_str)
-                            if 'choices' in data and len(data['choices']) > 0:
-                                delta = data['choices'][0].get('delta', {})
-                                if 'content' in delta and delta['content'] is not None:
-                                    content += delta['content']
-                        except json.JSONDecodeError:
-                            continue
+            ) as response:
+                response.raise_for_status()
+                
+                if self.stream:
+                    content = await self._read_llm_stream(response)
+                else:
+                    data = orjson.loads(await response.aread())
+                    content = data['choices'][0]['message']['content'] or ""
             
             return content.strip()
         except Exception as e:
@@ -117,7 +180,26 @@ class LLMAgent:
             self.llm_available = False  # Mark as unavailable after failure
             return ""
     
-    def run_task(self, task: str, max_turns: int = 5) -> Dict[str, Any]:
+    @staticmethod
+    async def _read_llm_stream(response) -> str:
+        """Accumulate the content deltas of a streaming chat completion."""
+        content = ""
+        async for line in response.aiter_lines():
+            if line.startswith('data: '):
+                data_str = line[6:]  # Remove 'data: ' prefix
+                if data_str.strip() == '[DONE]':
+                    break
+                try:
+                    data = orjson.loads(data_str)
+                    if 'choices' in data and len(data['choices']) > 0:
+                        delta = data['choices'][0].get('delta', {})
+                        if 'content' in delta and delta['content'] is not None:
+                            content += delta['content']
+                except orjson.JSONDecodeError:
+                    continue
+        return content
+    
+    async def run_task(self, task: str, max_turns: int = 5) -> Dict[str, Any]:
         """Run a task with multiple tool calls if needed."""
         print(f"🎯 Task: {task}")
         
@@ -134,64 +216,72 @@ class LLMAgent:
         results = []
         turn = 0
         
+        # Tasks already solved with the same tool set replay their tool sequence
+        plan_key = (task.strip().lower(), frozenset(self.tool_to_client))
+        plan = self._plan_cache.get(plan_key)
+        # A plan longer than this run's turn budget is not replayed
+        if plan and len(plan) <= max_turns:
+            print(f"♻️  Replaying cached plan: {' -> '.join(plan)}")
+            for turn, tool_name in enumerate(plan, 1):
+                print(f"\n--- Turn {turn} ---")
+                results.append(await self._execute_tool(turn, tool_name))
+            
+            if all(r['success'] for r in results):
+                print(f"✅ Task completed after {len(plan)} turn(s)")
+                return {
+                    'task': task,
+                    'turns': len(plan),
+                    'results': results,
+                    'final_result': results[-1]
+                }
+            
+            # The replayed calls count against max_turns and stay as context
+            print("⚠️  Cached plan failed, continuing with LLM planning")
+            del self._plan_cache[plan_key]
+        
+        # Only a plan the LLM explicitly judged DONE is cached; heuristic
+        # completions and fallback picks are not trusted for replay
+        confirmed = False
+        
         while turn < max_turns:
+            if results:
+                # One LLM decision per turn: either the task is done or the next tool
+                decision = await self._decide_next(task, results)
+                if decision == "DONE":
+                    print(f"✅ Task completed after {turn} turn(s)")
+                    confirmed = True
+                    break
+                if decision:
+                    selected_tool = self._tool_by_lower_name[decision.lower()]
+                else:
+                    # Not done and no usable tool named: try one not used yet
+                    tried = frozenset(r['tool'] for r in results)
+                    selected_tool = await self._select_tool(task, tried)
+            else:
+                # LLM-powered tool selection
+                selected_tool = await self._select_tool(task)
+            
             turn += 1
             print(f"\n--- Turn {turn} ---")
             
-            # LLM-powered tool selection
-            selected_tool = self._select_tool(task, results)
-            
             if not selected_tool:
                 print("No suitable tool found for this task.")
                 break
-                
-            print(f"🔧 Using tool: {selected_tool['name']}")
             
-            # Call the tool using the appropriate client
-            try:
-                client = self.tool_to_client[selected_tool['name']]
-                result = client.call_tool(selected_tool['name'], {})
-                
-                if 'error' in result:
-                    print(f"❌ Tool call failed: {result['error']['message']}")
-                    results.append({
-                        'turn': turn,
-                        'tool': selected_tool['name'],
-                        'success': False,
-                        'error': result['error']['message']
-                    })
-                elif result['result']['isError']:
-                    print("❌ Tool execution failed")
-                    results.append({
-                        'turn': turn,
-                        'tool': selected_tool['name'],
-                        'success': False,
-                        'error': 'Tool execution failed'
-                    })
-                else:
-                    content = result['result']['content'][0]['text']
-                    print(f"✅ Tool result: {content}")
-                    
-                    results.append({
-                        'turn': turn,
-                        'tool': selected_tool['name'],
-                        'success': True,
-                        'content': content
-                    })
-                    
-                    # LLM-powered task completion check
-                    if self._is_task_complete(task, results):
-                        print(f"✅ Task completed after {turn} turn(s)")
-                        break
-                        
-            except Exception as e:
-                print(f"❌ Error calling tool: {e}")
-                results.append({
-                    'turn': turn,
-                    'tool': selected_tool['name'],
-                    'success': False,
-                    'error': str(e)
-                })
+            results.append(await self._execute_tool(turn, selected_tool['name']))
+            
+            # Cheap completion check; ambiguous cases are left to _decide_next
+            if results[-1]['success'] and self._is_task_complete(task, results):
+                print(f"✅ Task completed after {turn} turn(s)")
+                break
+        else:
+            # The turn budget ran out before _decide_next could judge the last result
+            if results and results[-1]['success'] and await self._decide_next(task, results) == "DONE":
+                print(f"✅ Task completed after {turn} turn(s)")
+                confirmed = True
+        
+        if confirmed:
+            self._plan_cache[plan_key] = [r['tool'] for r in results if r['success']]
         
         return {
             'task': task,
@@ -200,19 +290,80 @@ class LLMAgent:
             'final_result': results[-1] if results else None
         }
     
-    def _select_tool(self, task: str, previous_results: List[Dict]) -> Optional[Dict]:
-        """LLM-powered tool selection."""
-        if not self.available_tools:
+    async def _execute_tool(self, turn: int, tool_name: str) -> Dict[str, Any]:
+        """Call a tool using the appropriate client and record the outcome."""
+        print(f"🔧 Using tool: {tool_name}")
+        
+        try:
+            client = self.tool_to_client[tool_name]
+            result = await client.call_tool(tool_name, {})
+            
+            if 'error' in result:
+                print(f"❌ Tool call failed: {result['error']['message']}")
+                return {
+                    'turn': turn,
+                    'tool': tool_name,
+                    'success': False,
+                    'error': result['error']['message']
+                }
+            elif result['result']['isError']:
+                print("❌ Tool execution failed")
+                return {
+                    'turn': turn,
+                    'tool': tool_name,
+                    'success': False,
+                    'error': 'Tool execution failed'
+                }
+            else:
+                content = result['result']['content'][0]['text']
+                print(f"✅ Tool result: {content}")
+                return {
+                    'turn': turn,
+                    'tool': tool_name,
+                    'success': True,
+                    'content': content
+                }
+                
+        except Exception as e:
+            print(f"❌ Error calling tool: {e}")
+            return {
+                'turn': turn,
+                'tool': tool_name,
+                'success': False,
+                'error': str(e)
+            }
+    
+    @staticmethod
+    def _tokenize(text: str) -> set:
+        """Split text into a set of lowercase word tokens."""
+        return set(re.findall(r"[a-z0-9]+", text.lower()))
+    
+    async def _select_tool(self, task: str, excluded: FrozenSet[str] = frozenset()) -> Optional[Dict]:
+        """Tool selection, only asking the LLM when the choice is ambiguous."""
+        # Excluded tools (e.g. ones already tried for this task) are not offered
+        candidates = [tool for tool in self.available_tools if tool['name'] not in excluded]
+        if not candidates:
             return None
         
-        return self._select_tool_with_llm(task, previous_results)
+        if len(candidates) == 1:
+            return candidates[0]
+        
+        # A tool is only taken without the LLM when the task mentions every
+        # distinctive word of its name, e.g. "current directory" for get_current_directory
+        task_tokens = self._tokenize(task)
+        matches = [
+            tool for tool, tokens in self._tool_tokens
+            if tool['name'] not in excluded and tokens and tokens <= task_tokens
+        ]
+        if len(matches) == 1:
+            return matches[0]
+        
+        return await self._select_tool_with_llm(task, candidates, excluded)
     
-    def _select_tool_with_llm(self, task: str, previous_results: List[Dict]) -> Optional[Dict]:
-        """LLM-powered tool selection."""
-        tools_context = "Available tools:\n"
-        for i, tool in enumerate(self.available_tools, 1):
-            server_info = f" (from {tool['server']})" if 'server' in tool else ""
-            tools_context += f"{i}. {tool['name']}: {tool['description']}{server_info}\n"
+    async def _select_tool_with_llm(self, task: str, candidates: List[Dict],
+                                    excluded: FrozenSet[str] = frozenset()) -> Optional[Dict]:
+        """LLM-powered tool selection among the candidate tools."""
+        tools_prompt = self._tools_prompt_excluding(excluded)
         
         messages = [
             {
@@ -230,34 +381,60 @@ Consider:
                 "role": "user",
                 "content": f"""Task: {task}
 
-{tools_context}
+{tools_prompt}
 
 Which tool should I use to complete this task? Respond with ONLY the tool name."""
             }
         ]
         
-        response = self._call_llm(messages)
-        
-        # Find the tool by name
-        for tool in self.available_tools:
-            if tool['name'].lower() == response.lower().strip():
-                return tool
+        response = await self._call_llm(messages)
         
         # If LLM failed, return first tool as last resort
-        return self.available_tools[0] if self.available_tools else None
+        return self._match_tool(response, excluded) or candidates[0]
     
-    def _is_task_complete(self, task: str, results: List[Dict]) -> bool:
-        """LLM-powered task completion check."""
-        if not results or not any(r['success'] for r in results):
-            return False
-            
-        return self._is_task_complete_with_llm(task, results)
+    def _tools_prompt_excluding(self, excluded: FrozenSet[str]) -> str:
+        """The "Available tools" prompt listing without the excluded tools."""
+        if not excluded:
+            return self._tools_prompt
+        tools = [tool for tool in self.available_tools if tool['name'] not in excluded]
+        return "Available tools:\n" + "".join(
+            self._tool_prompt_line(i, tool) for i, tool in enumerate(tools, 1)
+        )
+    
+    def _match_tool(self, response: str, excluded: FrozenSet[str] = frozenset()) -> Optional[Dict]:
+        """Resolve an LLM response to a tool not in excluded, tolerating typos and decorations."""
+        name = re.sub(r"[\"'`]", "", response).strip().lower()
+        tool = self._tool_by_lower_name.get(name)
+        if tool:
+            return tool if tool['name'] not in excluded else None
+        
+        names = [n for n, t in self._tool_by_lower_name.items() if t['name'] not in excluded]
+        
+        # A sentence that mentions exactly one tool name, e.g. "I would use the get_system_info tool"
+        mentioned = [n for n in names if re.search(rf"(?<!\w){re.escape(n)}(?!\w)", name)]
+        if len(mentioned) == 1:
+            return self._tool_by_lower_name[mentioned[0]]
+        
+        # Punctuation or small typos around the tool name
+        matches = difflib.get_close_matches(name, names, n=1, cutoff=0.6)
+        if matches:
+            return self._tool_by_lower_name[matches[0]]
+        
+        return None
     
-    def _is_task_complete_with_llm(self, task: str, results: List[Dict]) -> bool:
-        """LLM-powered task completion check."""
+    def _is_task_complete(self, task: str, results: List[Dict]) -> bool:
+        """Heuristic task completion check that needs no LLM call."""
         if not results or not any(r['success'] for r in results):
             return False
         
+        last_success = next(r for r in reversed(results) if r['success'])
+        return bool(last_success['content'].strip()
+                    and self.LOOKUP_TASK_RE.search(task)
+                    and not self.COMMAND_TASK_RE.search(task))
+    
+    async def _decide_next(self, task: str, results: List[Dict]) -> Optional[str]:
+        """LLM-powered decision: "DONE" if the task is complete, the next tool's name,
+        or None when the task is not complete but no usable tool was named."""
         # Get the latest successful result
         last_success = None
         for result in reversed(results):
@@ -265,15 +442,24 @@ Which tool should I use to complete this task? Respond with ONLY the tool name."
                 last_success = result
                 break
         
+        # Nothing to judge yet
         if not last_success:
-            return False
+            return None
+        
+        # Failed tools are not offered again; the call history keeps the prompt
+        # (and its LLM cache key) changing from turn to turn
+        failed = frozenset(r['tool'] for r in results if not r['success'])
+        history = "".join(
+            f"{r['turn']}. {r['tool']}: {'succeeded' if r['success'] else 'failed'}\n"
+            for r in results
+        )
         
         messages = [
             {
                 "role": "system",
-                "content": """You are a helpful assistant that determines if a task has been completed successfully.
+                "content": """You are a helpful assistant that decides the next step of a task.
 
-Analyze the original task and the tool result, then respond with ONLY "YES" if the task is complete or "NO" if more work is needed.
+Analyze the original task, the tools used so far, the latest tool result and the available tools. If the task is complete, respond with ONLY the word DONE. If more work is needed, respond with ONLY the exact name of the tool to use next. Never respond with anything else.
 
 Be practical about what's achievable:
 - If the task asks for a count and you can count items from the result, that's complete
@@ -287,19 +473,29 @@ Focus on whether the core question can be answered from the available data."""
                 "role": "user",
                 "content": f"""Task: {task}
 
-Tool result:
+Tools used so far:
+{history}
+Latest tool result (from {last_success['tool']}):
 {last_success['content']}
 
-Can the core question be answered from this result, even if not perfectly? Answer ONLY with YES or NO."""
+{self._tools_prompt_excluding(failed)}
+
+If the core question can be answered from this result, even if not perfectly, respond with ONLY DONE. Otherwise respond with ONLY the name of the next tool to use."""
             }
         ]
         
-        response = self._call_llm(messages)
-        print(f"🤔 LLM completion response: '{response}'")
+        response = await self._call_llm(messages)
+        print(f"🤔 LLM decision: '{response}'")
+        
+        if response.strip(string.whitespace + string.punctuation).upper() == "DONE":
+            return "DONE"
         
-        return response and response.upper().strip() == "YES"
+        # Anything else ("NO", prose, an empty reply from a failed call) means
+        # the task is not known to be complete
+        next_tool = self._match_tool(response, failed)
+        return next_tool['name'] if next_tool else None
     
-    def analyze_results(self, task: str, results: List[Dict]) -> str:
+    async def analyze_results(self, task: str, results: List[Dict]) -> str:
         """LLM-powered result analysis and formatting."""
         if not results or not any(r['success'] for r in results):
             return "❌ Task could not be completed successfully."
@@ -341,10 +537,10 @@ Please provide a clear, well-formatted response that directly answers the origin
             }
         ]
         
-        response = self._call_llm(messages)
+        response = await self._call_llm(messages)
         return response or f"✅ Result:\n{content}"
 
-def main():
+async def main():
     """Demo of the MCP agent."""
     import sys
     
@@ -379,7 +575,7 @@ def main():
     
     try:
         print("🤖 Initializing MCP agent...")
-        init_results, tools = agent.initialize()
+        init_results, tools = await agent.initialize()
         
         # Show summary of all connected servers
         server_names = [result['result']['serverInfo']['name'] for result in init_results]
@@ -387,14 +583,14 @@ def main():
         print(f"📊 Found {len(tools)} tool(s): {', '.join(tool['name'] for tool in tools)}")
         
         # Run the task
-        result = agent.run_task(task, max_turns=5)
+        result = await agent.run_task(task, max_turns=5)
         
         print(f"\n🎉 Final Summary:")
         print(f"Task: {result['task']}")
         print(f"Turns taken: {result['turns']}")
         
         # Analyze and present results
-        analysis = agent.analyze_results(task, result['results'])
+        analysis = await agent.analyze_results(task, result['results'])
         print(f"\n{analysis}")
         
     except Exception as e:
@@ -404,7 +600,8 @@ def main():
     finally:
         for client in agent.clients:
             client.close()
+        await close_http_client()
         print("\n🔌 All connections closed")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -14,25 +14,62 @@ The key insight is that FastMCP requires:
 3. SSE response parsing for streamable HTTP transport
 """
 
-import requests
-import json
+import asyncio
+import httpx
+import orjson
 from typing import Dict, Any, Optional
 
+# Shared connection pool for every MCP client and the LLM agent, so that
+# concurrent requests reuse keep-alive connections instead of reconnecting.
+# Connections belong to the event loop that opened them, so the pool is
+# created lazily and replaced when used from a new loop or after closing.
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP connection pool for the running event loop."""
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=30
+        )
+        _http_client_loop = loop
+    return _http_client
+
+async def close_http_client():
+    """Close the shared HTTP connection pool; the next request opens a new one."""
+    global _http_client, _http_client_loop
+    if _http_client is not None and _http_client_loop is asyncio.get_running_loop():
+        await _http_client.aclose()
+    _http_client = None
+    _http_client_loop = None
+
 class PureMCPClient:
     """A pure Python MCP client that works with FastMCP servers."""
     
     def __init__(self, base_url: str):
         self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
         self.session_id = None
         self.request_id = 0
+        # Sent with every message; mcp-session-id is added once the server assigns one
+        self._headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json, text/event-stream"  # Key requirement for FastMCP
+        }
         
+    @property
+    def session(self) -> httpx.AsyncClient:
+        """The shared HTTP connection pool used for this client's requests."""
+        return get_http_client()
+    
     def _get_next_request_id(self) -> int:
         """Get the next request ID for JSON-RPC messages."""
         self.request_id += 1
         return self.request_id
     
-    def _send_request(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def _send_request(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Send a JSON-RPC request via HTTP POST."""
         
         message = {
@@ -42,54 +79,48 @@ class PureMCPClient:
             "params": params or {}
         }
         
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json, text/event-stream"  # Key requirement for FastMCP
-        }
-        
-        # Add session ID header if we have one
-        if self.session_id:
-            headers["mcp-session-id"] = self.session_id
-            
-        response = self.session.post(
+        # Stream the body so SSE responses can be parsed as they arrive;
+        # the response is closed when the context manager exits
+        async with self.session.stream(
+            "POST",
             self.base_url,
-            headers=headers,
-            json=message
-        )
-        
-        # Extract session ID from response headers if present
-        if "mcp-session-id" in response.headers:
-            self.session_id = response.headers["mcp-session-id"]
-            
-        if response.status_code != 200:
-            print(f"Error response: {response.status_code}")
-            print(f"Response headers: {response.headers}")
-            print(f"Response body: {response.text}")
-            response.raise_for_status()
-            
-        # Check if response is SSE format
-        if response.headers.get('content-type') == 'text/event-stream':
-            return self._parse_sse_response(response.text)
-        else:
-            return response.json()
-    
-    def _parse_sse_response(self, sse_text: str) -> Dict[str, Any]:
-        """Parse Server-Sent Events response to extract JSON data."""
-        lines = sse_text.strip().split('\n')
-        
-        for line in lines:
+            headers=self._headers,
+            content=orjson.dumps(message)
+        ) as response:
+            # Extract session ID from response headers if present
+            session_id = response.headers.get("mcp-session-id")
+            if session_id and session_id != self.session_id:
+                self.session_id = session_id
+                self._headers["mcp-session-id"] = session_id
+                
+            if response.status_code != 200:
+                await response.aread()
+                print(f"Error response: {response.status_code}")
+                print(f"Response headers: {response.headers}")
+                print(f"Response body: {response.text}")
+                response.raise_for_status()
+                
+            # Check if response is SSE format
+            if response.headers.get('content-type') == 'text/event-stream':
+                return await self._parse_sse_stream(response)
+            else:
+                return orjson.loads(await response.aread())
+    
+    async def _parse_sse_stream(self, response: httpx.Response) -> Dict[str, Any]:
+        """Parse a Server-Sent Events stream, returning the first JSON data payload."""
+        async for line in response.aiter_lines():
             if line.startswith('data: '):
                 json_data = line[6:]  # Remove 'data: ' prefix
                 try:
-                    return json.loads(json_data)
-                except json.JSONDecodeError as e:
+                    return orjson.loads(json_data)
+                except orjson.JSONDecodeError as e:
                     print(f"Failed to parse JSON from SSE data: {json_data}")
                     raise e
         
-        print(f"No data found in SSE response: {sse_text}")
+        print("No data found in SSE response")
         return {}
     
-    def _send_notification(self, method: str, params: Optional[Dict[str, Any]] = None):
+    async def _send_notification(self, method: str, params: Optional[Dict[str, Any]] = None):
         """Send a JSON-RPC notification (no response expected)."""
         message = {
             "jsonrpc": "2.0",
@@ -97,18 +128,10 @@ class PureMCPClient:
             "params": params or {}
         }
         
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json, text/event-stream"
-        }
-        
-        if self.session_id:
-            headers["mcp-session-id"] = self.session_id
-            
-        response = self.session.post(
+        response = await self.session.post(
             self.base_url,
-            headers=headers,
-            json=message
+            headers=self._headers,
+            content=orjson.dumps(message)
         )
         
         # Notifications don't expect responses, but check for errors
@@ -117,9 +140,9 @@ class PureMCPClient:
         
         return response
     
-    def initialize(self) -> Dict[str, Any]:
+    async def initialize(self) -> Dict[str, Any]:
         """Initialize the MCP session."""
-        result = self._send_request("initialize", {
+        result = await self._send_request("initialize", {
             "protocolVersion": "2024-11-05",
             "capabilities": {
                 "roots": {"listChanged": True},
@@ -132,48 +155,53 @@ class PureMCPClient:
         })
         
         # Send initialized notification as required by MCP protocol
-        self._send_notification("notifications/initialized")
+        await self._send_notification("notifications/initialized")
         
         return result
     
-    def list_tools(self) -> Dict[str, Any]:
+    async def list_tools(self) -> Dict[str, Any]:
         """List available tools."""
-        return self._send_request("tools/list", {})
+        return await self._send_request("tools/list", {})
     
-    def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Call a tool."""
-        return self._send_request("tools/call", {
+        return await self._send_request("tools/call", {
             "name": name,
             "arguments": arguments or {}
         })
     
-    def list_resources(self) -> Dict[str, Any]:
+    async def list_resources(self) -> Dict[str, Any]:
         """List available resources."""
-        return self._send_request("resources/list", {})
+        return await self._send_request("resources/list", {})
     
-    def read_resource(self, uri: str) -> Dict[str, Any]:
+    async def read_resource(self, uri: str) -> Dict[str, Any]:
         """Read a resource by URI."""
-        return self._send_request("resources/read", {
+        return await self._send_request("resources/read", {
             "uri": uri
         })
     
-    def list_prompts(self) -> Dict[str, Any]:
+    async def list_prompts(self) -> Dict[str, Any]:
         """List available prompts."""
-        return self._send_request("prompts/list", {})
+        return await self._send_request("prompts/list", {})
     
-    def get_prompt(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def get_prompt(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Get a prompt by name."""
-        return self._send_request("prompts/get", {
+        return await self._send_request("prompts/get", {
             "name": name,
             "arguments": arguments or {}
         })
     
     def close(self):
-        """Close the session."""
-        if self.session:
-            self.session.close()
+        """Close the session.
+
+        The underlying connection pool is shared between clients; release it
+        with ``close_http_client()`` once all clients are done. A closed pool
+        is recreated on the next request.
+        """
+        self._headers.pop("mcp-session-id", None)
+        self.session_id = None
 
-def main():
+async def main():
     """Demo of the simple MCP client."""
     import sys
     
@@ -184,12 +212,12 @@ def main():
     
     try:
         print("🔌 Initializing MCP session...")
-        init_result = client.initialize()
+        init_result = await client.initialize()
         print(f"✅ Connected to: {init_result['result']['serverInfo']['name']}")
         print(f"📋 Protocol version: {init_result['result']['protocolVersion']}")
         
         print("\n🔧 Listing available tools...")
-        tools_result = client.list_tools()
+        tools_result = await client.list_tools()
         tools = tools_result['result']['tools']
         print(f"📊 Found {len(tools)} tool(s):")
         
@@ -211,7 +239,7 @@ def main():
             tool_name = first_tool['name']
             
             print(f"\n🚀 Calling tool: {tool_name}...")
-            call_result = client.call_tool(tool_name, {})
+            call_result = await client.call_tool(tool_name, {})
             
             if 'error' in call_result:
                 print(f"❌ Tool call failed: {call_result['error']['message']}")
@@ -232,7 +260,8 @@ def main():
         traceback.print_exc()
     finally:
         client.close()
+        await close_http_client()
         print("\n🔌 Connection closed")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())